@@ -1,7 +1,8 @@
 # ia_resumen_bancario.py
 # Herramienta para uso interno - AIE San Justo
 
-import io, re
+import hashlib, importlib.util, io, re
+from functools import lru_cache
 from pathlib import Path
 import numpy as np
 import pandas as pd
@@ -16,22 +17,15 @@ if LOGO.exists():
     st.image(str(LOGO), width=200)
 st.title("IA Resumen Bancario")
 
-# --- deps diferidas ---
+# --- deps opcionales ---
+# PyMuPDF (opcional, no va en requirements.txt): extracción mucho más rápida que pdfminer.
+# Es AGPL: instalarlo en un despliegue web implica cumplir esa licencia. Sin él (o si falla
+# con un PDF), todo sale de pdfplumber, que es el motor por defecto.
 try:
-    import pdfplumber
-except Exception as e:
-    st.error(f"No se pudo importar pdfplumber: {e}\nRevisá requirements.txt")
-    st.stop()
-
-# Para PDF del “Resumen Operativo: Registración Módulo IVA”
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib import colors
-    REPORTLAB_OK = True
+    import pymupdf
+    PYMUPDF_OK = True
 except Exception:
-    REPORTLAB_OK = False
+    PYMUPDF_OK = False
 
 # --- regex base ---
 DATE_RE  = re.compile(r"\b\d{1,2}/\d{2}/\d{2,4}\b")  # dd/mm/aa o dd/mm/aaaa
@@ -42,20 +36,35 @@ MONEY_RE = re.compile(
 )
 
 LONG_INT_RE = re.compile(r"\b\d{6,}\b")
+ID_UNSAFE_RE = re.compile(r"[^0-9A-Za-z]+")  # para armar acc_id (claves de widgets) desde el nro
 
 # ====== PATRONES ESPECÍFICOS ======
 # ---- Banco Macro ----
 HYPH = r"[-\u2010\u2011\u2012\u2013\u2014\u2212]"  # guiones variantes
-ACCOUNT_TOKEN_RE = re.compile(rf"\b\d\s*{HYPH}\s*\d{{3}}\s*{HYPH}\s*\d{{10}}\s*{HYPH}\s*\d\b")
-SALDO_ANT_PREFIX   = re.compile(r"^SALDO\s+U?LTIMO\s+EXTRACTO\s+AL", re.IGNORECASE)
-SALDO_FINAL_PREFIX = re.compile(r"^SALDO\s+FINAL\s+AL\s+D[ÍI]A",     re.IGNORECASE)
+HYPH_SET = frozenset("-\u2010\u2011\u2012\u2013\u2014\u2212")  # prefiltro: sin guion no hay token de cuenta
+HYPH_TRANS = str.maketrans(dict.fromkeys("\u2010\u2011\u2012\u2013\u2014\u2212", "-"))  # variantes -> "-"
+# Las líneas llegan normalizadas (" ".join(l.split())): entre segmentos hay a lo sumo un espacio,
+# así que " ?" equivale a \s* sin dejarle al motor tramos de blancos para reintentar
+ACCOUNT_ANY_HYPH_PAT = rf"\b\d ?{HYPH} ?\d{{3}} ?{HYPH} ?\d{{10}} ?{HYPH} ?\d\b"
+# Segmentación Macro: se busca sobre ln.translate(HYPH_TRANS), con guion literal
+ACCOUNT_TOKEN_RE = re.compile(r"\b\d ?- ?\d{3} ?- ?\d{10} ?- ?\d\b")
+# Los patrones sin IGNORECASE se aplican sobre la línea ya pasada a mayúsculas
+SALDO_ANT_PREFIX   = re.compile(r"^SALDO\s+U?LTIMO\s+EXTRACTO\s+AL")
+SALDO_FINAL_PREFIX = re.compile(r"^SALDO\s+FINAL\s+AL\s+D[ÍI]A")
 RE_MACRO_ACC_START = re.compile(r"^CUENTA\s+(.+)$", re.IGNORECASE)
 RE_HAS_NRO         = re.compile(r"\bN[ROº°\.]*\s*:?\b", re.IGNORECASE)
 RE_MACRO_ACC_NRO   = re.compile(rf"N[ROº°\.]*\s*:?\s*({ACCOUNT_TOKEN_RE.pattern})", re.IGNORECASE)
-PER_PAGE_TITLE_PAT = re.compile(rf"^CUENTA\s+.+N[ROº°\.]*\s*:?\s*({ACCOUNT_TOKEN_RE.pattern})", re.IGNORECASE)
-HEADER_ROW_PAT = re.compile(r"^(FECHA\s+DESCRIPC(?:I[ÓO]N|ION)|FECHA\s+CONCEPTO|FECHA\s+DETALLE).*(SALDO|D[ÉE]BITO|CR[ÉE]DITO)", re.IGNORECASE)
-NON_MOV_PAT    = re.compile(r"(INFORMACI[ÓO]N\s+DE\s+SU/S\s+CUENTA/S|TOTAL\s+RESUMEN\s+OPERATIVO|RESUMEN\s+DEL\s+PER[IÍ]ODO)", re.IGNORECASE)
-INFO_HEADER    = re.compile(r"INFORMACI[ÓO]N\s+DE\s+SU/S\s+CUENTA/S", re.IGNORECASE)
+PER_PAGE_TITLE_PAT = re.compile(rf"^CUENTA\s+.+N[ROº°\.]*\s*:?\s*({ACCOUNT_ANY_HYPH_PAT})")
+HEADER_ROW_PAT = re.compile(r"^(FECHA\s+DESCRIPC(?:I[ÓO]N|ION)|FECHA\s+CONCEPTO|FECHA\s+DETALLE).*(SALDO|D[ÉE]BITO|CR[ÉE]DITO)")
+NON_MOV_PAT    = re.compile(r"(INFORMACI[ÓO]N\s+DE\s+SU/S\s+CUENTA/S|TOTAL\s+RESUMEN\s+OPERATIVO|RESUMEN\s+DEL\s+PER[IÍ]ODO)")
+INFO_HEADER    = re.compile(r"INFORMACI[ÓO]N\s+DE\s+SU/S\s+CUENTA/S")
+
+# Barrido único por línea en parse_lines (se despacha por m.lastgroup)
+LINE_TOKEN_RE = re.compile(
+    rf"(?P<skip>{PER_PAGE_TITLE_PAT.pattern}|{HEADER_ROW_PAT.pattern}|{NON_MOV_PAT.pattern})"
+    rf"|(?P<date>{DATE_RE.pattern})"
+    rf"|(?P<money>{MONEY_RE.pattern})"
+)
 
 # ---- Banco de Santa Fe (Consolidado de cuentas) ----
 SF_ACC_LINE_RE = re.compile(
@@ -77,39 +86,78 @@ BNA_ACC_ONLY_RE = re.compile(
 )
 # Bloque de gastos finales post “SALDO FINAL”
 BNA_GASTOS_RE = re.compile(
-    r"-\s*(INTERESES|COMISION|SELLADOS|I\.V\.A\.?\s*BASE|SEGURO\s+DE\s+VIDA)\s*\$\s*([0-9\.\s]+,\d{2})",
+    r"-\s*(?P<lbl>INTERESES|COMISION|SELLADOS|(?P<iva>I\.V\.A\.?\s*BASE)|SEGURO\s+DE\s+VIDA)\s*\$\s*(?P<imp>[0-9\.\s]+,\d{2})",
     re.IGNORECASE
 )
 
 # ---- NUEVO: Santa Fe - "SALDO ULTIMO RESUMEN" sin fecha ----
-SF_SALDO_ULT_RE = re.compile(r"SALDO\s+U?LTIMO\s+RESUMEN", re.IGNORECASE)
+SF_SALDO_ULT_RE = re.compile(r"SALDO\s+U?LTIMO\s+RESUMEN")
 
 # --- utils ---
+_MONEY_TRANS = str.maketrans({".": "", " ": "", "−": "-"})
+
+
+@lru_cache(maxsize=16384)
 def normalize_money(tok: str) -> float:
     """
     Normaliza importes argentinos, aceptando:
     -2.114.972,30   ó   2.114.972,30-
+    Los mismos tokens se repiten mucho (p.ej. "0,00"): se memoiza por string.
     """
     if not tok:
         return np.nan
-    tok = tok.strip().replace("−", "-")
-    neg = tok.endswith("-") or tok.startswith("-")
-    tok = tok.strip("-")
-    if "," not in tok:
+    tok = tok.strip().translate(_MONEY_TRANS)
+    neg = tok[-1:] == "-" or tok[:1] == "-"
+    main, sep, frac = tok.strip("-").rpartition(",")
+    if not sep:
         return np.nan
-    main, frac = tok.rsplit(",", 1)
-    main = main.replace(".", "").replace(" ", "")
     try:
         val = float(f"{main}.{frac}")
-        return -val if neg else val
-    except Exception:
+    except ValueError:
         return np.nan
+    return -val if neg else val
+
+
+def normalize_money_vec(toks) -> np.ndarray:
+    """
+    Columna completa de tokens -> float64 en un solo arreglo; cada token distinto
+    se convierte una vez (caché de normalize_money).
+    """
+    return np.fromiter(map(normalize_money, toks), dtype=float, count=len(toks))
+
+
+_AR_SWAP = str.maketrans(",.", ".,")  # 1,234.56 -> 1.234,56 en un solo translate
 
 
 def fmt_ar(n) -> str:
     if n is None or (isinstance(n, float) and np.isnan(n)):
         return "—"
-    return f"{n:,.2f}".replace(",", "§").replace(".", ",").replace("§", ".")
+    return f"{n:,.2f}".translate(_AR_SWAP)
+
+
+def fmt_ar_series(s: pd.Series) -> pd.Series:
+    """
+    fmt_ar por columna: un format por celda y el cambio de separadores en un solo translate.
+    """
+    out = s.map("{:,.2f}".format, na_action="ignore").astype(object).str.translate(_AR_SWAP)
+    return out.where(s.notna(), "—")
+
+
+def money_view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copia para mostrar en pantalla con los importes ya formateados como texto.
+    Las columnas de importes se formatean juntas, como un solo bloque aplanado.
+    Copia superficial: el resto de las columnas se comparte con `df`; cada columna
+    de importes se reemplaza entera (asignación por columna), `df` no se toca.
+    """
+    view = df.copy(deep=False)
+    cols = [c for c in ("debito", "credito", "importe", "saldo") if c in view.columns]
+    if cols:
+        flat = pd.Series(df[cols].to_numpy(dtype=float).ravel(order="F"))
+        txt = fmt_ar_series(flat).to_numpy(dtype=object).reshape(len(view), len(cols), order="F")
+        for j, c in enumerate(cols):
+            view[c] = txt[:, j]
+    return view
 
 
 def metric_full(label: str, value: str):
@@ -137,39 +185,67 @@ def metric_full(label: str, value: str):
     )
 
 
-def lines_from_text(page):
-    txt = page.extract_text() or ""
+def lines_from_text(page, txt=None):
+    if txt is None:
+        txt = page.extract_text() or ""
     return [" ".join(l.split()) for l in txt.splitlines()]
 
 
-def lines_from_words(page, ytol=2.0):
-    words = page.extract_words(extra_attrs=["x0", "top"])
-    if not words:
+def lines_from_pymupdf(page, ytol=3.0, xtol=3.0):
+    """
+    Líneas de una página PyMuPDF armadas desde sus caracteres, como extract_text de
+    pdfplumber. El renglón se agrupa por línea base (origin y, a <= ytol de la anterior)
+    y no por el borde superior, que depende del tamaño de letra: un importe en 11 pt
+    queda en el mismo renglón que la fecha en 8 pt. Dentro del renglón, orden por x0 y
+    corte de palabra donde pdfplumber lo hace: un blanco o un hueco de más de xtol.
+    """
+    # sin ligaduras ni blancos inventados en los huecos: el corte de palabra se decide acá, como pdfplumber
+    flags = pymupdf.TEXT_PRESERVE_WHITESPACE | pymupdf.TEXT_MEDIABOX_CLIP | pymupdf.TEXT_INHIBIT_SPACES
+    chars = [
+        (c["origin"][1], c["bbox"][0], c["bbox"][2], c["c"])
+        for b in page.get_text("rawdict", flags=flags)["blocks"]
+        for ln in b.get("lines", ())
+        for sp in ln["spans"]
+        for c in sp["chars"]
+    ]
+    if not chars:
         return []
-    words.sort(key=lambda w: (round(w["top"] / ytol), w["x0"]))
-    lines, cur, band = [], [], None
-    for w in words:
-        b = round(w["top"] / ytol)
-        if band is None or b == band:
-            cur.append(w)
-        else:
-            # cerramos la línea anterior
-            lines.append(" ".join(x["text"] for x in cur))
-            cur = [w]
-        band = b
-    if cur:
-        lines.append(" ".join(x["text"] for x in cur))
+    base = np.fromiter((c[0] for c in chars), dtype=float, count=len(chars))
+    by_base = np.argsort(base, kind="stable")
+    bands = np.empty(len(chars), dtype=np.int64)
+    bands[by_base] = np.concatenate(([0], np.cumsum(np.diff(base[by_base]) > ytol)))
+    x0s = np.fromiter((c[1] for c in chars), dtype=float, count=len(chars))
+    order = np.lexsort((x0s, bands)).tolist()  # estable: por renglón y luego x0
+    bands = bands.tolist()
+
+    lines, cur, band, prev = [], [], None, None
+    for i in order:
+        _, x0, x1, ch = chars[i]
+        if bands[i] != band:
+            if cur:
+                lines.append("".join(cur))
+            cur, band, prev = [], bands[i], None
+        if ch.isspace():
+            cur.append(" ")
+            prev = None
+            continue
+        if prev is not None and (x0 > prev[1] + xtol or x0 < prev[0]):
+            cur.append(" ")
+        cur.append(ch)
+        prev = (x0, x1)
+    lines.append("".join(cur))
     return [" ".join(l.split()) for l in lines]
 
 
+DESC_PREFIX_RE = re.compile(r"^(?:SAN JUS|CASA RO|CENTRAL|GOBERNA|GOBERNADOR|SANTA FE|ROSARIO) ")  # sucursales
+
+
+@lru_cache(maxsize=8192)
 def normalize_desc(desc: str) -> str:
+    """Las mismas leyendas (IMPTRANS, COMISION, ...) se repiten en todo el resumen: memoizado."""
     if not desc:
         return ""
-    u = desc.upper()
-    for pref in ("SAN JUS ", "CASA RO ", "CENTRAL ", "GOBERNA ", "GOBERNADOR ", "SANTA FE ", "ROSARIO "):
-        if u.startswith(pref):
-            u = u[len(pref):]
-            break
+    u = DESC_PREFIX_RE.sub("", desc.upper(), count=1)
     u = LONG_INT_RE.sub("", u)
     u = " ".join(u.split())
     return u
@@ -181,60 +257,95 @@ BANK_SANTAFE_HINTS  = ("BANCO DE SANTA FE","NUEVO BANCO DE SANTA FE","SALDO ANTE
 BANK_NACION_HINTS   = (BNA_NAME_HINT, "SALDO ANTERIOR", "SALDO FINAL", "I.V.A. BASE", "COMIS.")
 
 
-def _text_from_pdf(file_like) -> str:
-    try:
-        with pdfplumber.open(file_like) as pdf:
-            return "\n".join((p.extract_text() or "") for p in pdf.pages)
-    except Exception:
-        return ""
+def _hint_score(U: str, hints) -> int:
+    """
+    Cantidad de hints presentes. Solo cuenta la presencia: `in` corta en la primera
+    aparición, y la frecuencia no sirve para desempatar (IMPTRANS, COMIS. o SALDO
+    ANTERIOR se repiten en cada renglón y cambiarían el banco detectado).
+    """
+    return sum(1 for k in hints if k in U)
 
 
 def detect_bank_from_text(txt: str) -> str:
     U = (txt or "").upper()
-    score_macro = sum(1 for k in BANK_MACRO_HINTS   if k in U)
-    score_sf    = sum(1 for k in BANK_SANTAFE_HINTS if k in U)
-    score_bna   = sum(1 for k in BANK_NACION_HINTS  if k in U)
     scores = [
-        ("Banco Macro",              score_macro),
-        ("Banco de Santa Fe",        score_sf),
-        ("Banco de la Nación Argentina", score_bna),
+        ("Banco Macro",              _hint_score(U, BANK_MACRO_HINTS)),
+        ("Banco de Santa Fe",        _hint_score(U, BANK_SANTAFE_HINTS)),
+        ("Banco de la Nación Argentina", _hint_score(U, BANK_NACION_HINTS)),
     ]
-    scores.sort(key=lambda x: x[1], reverse=True)
+    scores.sort(key=lambda x: x[1], reverse=True)  # estable: ante empate, el orden de la lista
     return scores[0][0] if scores[0][1] > 0 else "Banco no identificado"
 
 
 # ---------- extracción de líneas ----------
-def extract_all_lines(file_like):
-    out = []
+def _pymupdf_pages(data: bytes) -> list[list[str]]:
+    """Líneas (tipo extract_text) de cada página, con PyMuPDF."""
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        return [lines_from_pymupdf(page) for page in doc]
+
+
+def iter_all_lines(file_like, page_texts=None):
+    """
+    Genera (página, línea) con las líneas de texto de cada página, una sola extracción
+    por página. (Las líneas que se armaban aparte con extract_words(extra_attrs=["x0", "top"])
+    salían carácter por carácter, "1 2 / 0 1 / 2 4 T R A N S F ...": ninguna regex de
+    fecha, importe o cuenta podía tomarlas, así que esa segunda pasada ya no se hace.)
+    No hay streaming: _parse_pdf_once guarda la lista completa de líneas en el memo
+    de la sesión (un parseo por archivo subido), así que el generador se consume entero.
+    Con PyMuPDF se leen todas las páginas antes de devolver la primera línea (mucho más
+    rápido que pdfminer): si PyMuPDF falla con el archivo, se reintenta con pdfplumber
+    sin haber entregado líneas a medias.
+    Con pdfplumber se recorre página por página y se libera el caché de cada una.
+    Si se pasa `page_texts` (lista), agrega ahí el texto crudo de cada página,
+    sin otra pasada por el PDF.
+    """
+    pages = None
+    if PYMUPDF_OK:
+        try:
+            pages = _pymupdf_pages(file_like.read())
+        except Exception:
+            file_like.seek(0)  # PDF que PyMuPDF no lee: se reintenta con pdfplumber
+    if pages is not None:
+        for pi, lt in enumerate(pages, start=1):
+            if page_texts is not None:
+                page_texts.append("\n".join(lt))
+            for l in lt:
+                if l.strip():
+                    yield (pi, l)
+        return
     with pdfplumber.open(file_like) as pdf:
         for pi, p in enumerate(pdf.pages, start=1):
-            lt = lines_from_text(p)
-            lw = lines_from_words(p, ytol=2.0)
-            seen = set(lt)
-            combined = lt + [l for l in lw if l not in seen]
-            out.extend([(pi, l) for l in combined if l.strip()])
-    return out
+            txt = p.extract_text() or ""
+            if page_texts is not None:
+                page_texts.append(txt)
+            lt = lines_from_text(p, txt)
+            p.close()  # flush_cache() + get_textmap.cache_clear()
+            for l in lt:
+                if l.strip():
+                    yield (pi, l)
 
 
 # ---------- “Información de su/s Cuenta/s” (whitelist Macro) ----------
 def _normalize_account_token(tok: str) -> str:
-    return re.sub(rf"\s*{HYPH}\s*", "-", tok)
+    return tok.replace(" ", "")  # el token ya viene con guiones ASCII y a lo sumo un espacio
 
 
-def macro_extract_account_whitelist(file_like) -> dict:
+def macro_extract_account_whitelist(all_lines) -> dict:
+    """
+    Recorre (página, línea) hasta el fin de la tabla "Información de su/s Cuenta/s".
+    """
     info = {}
-    all_lines = extract_all_lines(file_like)
     in_table = False
     last_tipo = None
     for _, ln in all_lines:
-        if INFO_HEADER.search(ln):
+        u = ln.upper()
+        if INFO_HEADER.search(u):
             in_table = True
             continue
         if in_table:
-            m_token = ACCOUNT_TOKEN_RE.search(ln)
+            m_token = None if HYPH_SET.isdisjoint(ln) else ACCOUNT_TOKEN_RE.search(ln.translate(HYPH_TRANS))
             if m_token:
                 nro = _normalize_account_token(m_token.group(0))
-                u = ln.upper()
                 if "CORRIENTE" in u and "ESPECIAL" in u and ("DOLAR" in u or "DÓLAR" in u or "DOLARES" in u or "DÓLARES" in u):
                     tipo = "CUENTA CORRIENTE ESPECIAL EN DOLARES"
                 elif "CORRIENTE" in u and "ESPECIAL" in u:
@@ -246,7 +357,7 @@ def macro_extract_account_whitelist(file_like) -> dict:
                 info[nro] = {"titulo": tipo}
                 last_tipo = tipo
             else:
-                if ln.strip().startswith("CUENTA ") and "NRO" in ln.upper():
+                if ln.strip().startswith("CUENTA ") and "NRO" in u:
                     break
     return info
 
@@ -261,11 +372,14 @@ def _normalize_title_from_pending(pending_title: str) -> str:
 
 
 # ---------- Macro: segmentación por cuentas (ID = número completo) ----------
-def macro_split_account_blocks(file_like):
-    whitelist = macro_extract_account_whitelist(file_like)
+def macro_split_account_blocks(all_lines: list[tuple[int, str]]):
+    """
+    Recibe las líneas ya extraídas (página, línea): el PDF no se vuelve a abrir
+    para la whitelist, que solo recorre el encabezado del mismo listado.
+    """
+    whitelist = macro_extract_account_whitelist(all_lines)
     white_set = set(whitelist.keys())
 
-    all_lines = extract_all_lines(file_like)
     accounts, order = {}, []
     current_nro = None
     pending_title = None
@@ -284,11 +398,12 @@ def macro_split_account_blocks(file_like):
         current_nro = nro
 
     for (pi, ln) in all_lines:
+        h = ln.translate(HYPH_TRANS) if not HYPH_SET.isdisjoint(ln) else None  # None: sin guion no hay token
         m_title = RE_MACRO_ACC_START.match(ln)
         if m_title:
             pending_title = "CUENTA " + m_title.group(1).strip()
             expect_token_in = 12
-            m_same_line = RE_MACRO_ACC_NRO.search(ln) or ACCOUNT_TOKEN_RE.search(ln)
+            m_same_line = (RE_MACRO_ACC_NRO.search(h) or ACCOUNT_TOKEN_RE.search(h)) if h else None
             if m_same_line:
                 nro = _normalize_account_token(m_same_line.group(1) if m_same_line.re is RE_MACRO_ACC_NRO else m_same_line.group(0))
                 if (not white_set) or (nro in white_set):
@@ -299,7 +414,7 @@ def macro_split_account_blocks(file_like):
 
         if pending_title and expect_token_in > 0:
             expect_token_in -= 1
-            m_nro = RE_MACRO_ACC_NRO.search(ln)
+            m_nro = RE_MACRO_ACC_NRO.search(h) if h else None
             if m_nro:
                 nro = _normalize_account_token(m_nro.group(1))
                 if (not white_set) or (nro in white_set):
@@ -307,7 +422,7 @@ def macro_split_account_blocks(file_like):
                 pending_title = None
                 expect_token_in = 0
                 continue
-            m_tok = ACCOUNT_TOKEN_RE.search(ln)
+            m_tok = ACCOUNT_TOKEN_RE.search(h) if h else None
             if m_tok:
                 nro = _normalize_account_token(m_tok.group(0))
                 if (not white_set) or (nro in white_set):
@@ -320,7 +435,7 @@ def macro_split_account_blocks(file_like):
                 continue
 
         if (not pending_title) and white_set:
-            m_fallback = ACCOUNT_TOKEN_RE.search(ln)
+            m_fallback = ACCOUNT_TOKEN_RE.search(h) if h else None
             if m_fallback:
                 nro = _normalize_account_token(m_fallback.group(0))
                 if nro in white_set and current_nro != nro:
@@ -340,118 +455,168 @@ def macro_split_account_blocks(file_like):
 
 
 # ---------- Parsing movimientos (genérico: Macro/SF/BNA) ----------
-def parse_lines(lines) -> pd.DataFrame:
-    rows = []
-    seq = 0  # preserva orden exacto de aparición
-    for ln in lines:
-        if not ln.strip():
+def parse_lines(lines, lines_upper=None, saldo_anterior=np.nan) -> pd.DataFrame:
+    """
+    Movimientos en orden de aparición. Con `saldo_anterior`, la fila SALDO ANTERIOR
+    va primera (orden=0) al armar las columnas: sin concat ni fila agregada después.
+    """
+    if lines_upper is None:
+        lines_upper = [ln.upper() for ln in lines]
+    # columnas: los importes se juntan como tokens y se convierten al final de una vez
+    fechas, descs, imp_toks, saldo_toks = [], [], [], []
+    for ln, U in zip(lines, lines_upper):
+        if U.count(",") < 2:  # cada importe lleva su coma: sin dos no hay importe + saldo (ni línea vacía)
             continue
-        if PER_PAGE_TITLE_PAT.search(ln) or HEADER_ROW_PAT.search(ln) or NON_MOV_PAT.search(ln):
+        # Un solo barrido por línea: exclusión (títulos/encabezados), fecha e importes
+        d, am, skip = None, [], False
+        for m in LINE_TOKEN_RE.finditer(U):
+            kind = m.lastgroup
+            if kind == "money":
+                am.append(m)
+            elif kind == "date":
+                if d is None:
+                    d = m
+            else:
+                skip = True
+                break
+        if skip:
             continue
-        am = list(MONEY_RE.finditer(ln))
+        if len(U) != len(ln):  # upper() cambió longitudes: spans sobre la línea original
+            d, am = DATE_RE.search(ln), list(MONEY_RE.finditer(ln))
         if len(am) < 2:
             continue
-        d = DATE_RE.search(ln)
         if not d or d.end() >= am[0].start():
             continue
-        saldo   = normalize_money(am[-1].group(0))
-        importe = normalize_money(am[-2].group(0))
-        first_money = am[0]
-        desc = ln[d.end(): first_money.start()].strip()
-        seq += 1
-        rows.append({
-            "fecha": pd.to_datetime(d.group(0), dayfirst=True, errors="coerce"),
-            "descripcion": desc,
-            "desc_norm": normalize_desc(desc),
-            "debito": 0.0,
-            "credito": 0.0,
-            "importe": importe,      # informativo; conciliamos por Δ saldo
-            "saldo": saldo,
-            "pagina": 0,
-            "orden": seq
-        })
-    return pd.DataFrame(rows)
+        fechas.append(d.group(0))
+        descs.append(ln[d.end(): am[0].start()].strip())
+        imp_toks.append(am[-2].group(0))
+        saldo_toks.append(am[-1].group(0))
+    if not descs:
+        return pd.DataFrame()
+    # una sola conversión; format="mixed" interpreta cada fecha por separado (dd/mm/aa y dd/mm/aaaa)
+    fecha = pd.to_datetime(fechas, dayfirst=True, errors="coerce", format="mixed")
+    desc_norm = [normalize_desc(x) for x in descs]
+    importe = normalize_money_vec(imp_toks)           # informativo; conciliamos por Δ saldo
+    saldo = normalize_money_vec(saldo_toks)
+    primero = 1
+    if not np.isnan(saldo_anterior):
+        first_date = fecha.min()
+        fecha = fecha.insert(0, (first_date - pd.Timedelta(days=1)).normalize() + pd.Timedelta(hours=23, minutes=59, seconds=59) if pd.notna(first_date) else pd.NaT)
+        descs.insert(0, "SALDO ANTERIOR")
+        desc_norm.insert(0, "SALDO ANTERIOR")
+        importe = np.concatenate(([0.0], importe))
+        saldo = np.concatenate(([float(saldo_anterior)], saldo))
+        primero = 0
+    return pd.DataFrame({
+        "fecha": fecha,
+        "descripcion": descs,
+        "desc_norm": desc_norm,
+        "debito": 0.0,
+        "credito": 0.0,
+        "importe": importe,
+        "saldo": saldo,
+        "pagina": 0,
+        "orden": np.arange(primero, len(descs) + primero),  # preserva orden exacto de aparición
+    })
 
 
 # ---------- Saldos ----------
-def _only_one_amount(line: str) -> bool:
-    return len(list(MONEY_RE.finditer(line))) == 1
+@lru_cache(maxsize=8192)
+def _money_tokens(line: str) -> tuple[str, ...]:
+    """
+    Importes de la línea, memoizado por string: los buscadores de saldo preguntan
+    por la misma línea varias veces (¿un solo importe? -> ¿cuál?) y en varias pasadas.
+    """
+    if "," not in line:  # prefiltro: todo importe lleva coma decimal
+        return ()
+    return tuple(m.group(0) for m in MONEY_RE.finditer(line))
+
 
+def _single_amount(line: str) -> float:
+    """Valor del importe si la línea trae exactamente uno; si no, NaN (una sola búsqueda memoizada)."""
+    toks = _money_tokens(line)
+    return normalize_money(toks[0]) if len(toks) == 1 else np.nan
 
-def _first_amount_value(line: str) -> float:
-    m = MONEY_RE.search(line)
-    return normalize_money(m.group(0)) if m else np.nan
 
+def _saldo_line_idx(lines_upper) -> list[int]:
+    """Índices de las líneas que mencionan SALDO: los buscadores de saldo solo recorren estas."""
+    return [i for i, u in enumerate(lines_upper) if "SALDO" in u]
 
-def find_saldo_final_from_lines(lines):
-    # 1) Macro/otros con formato expreso
-    for ln in reversed(lines):
-        if SALDO_FINAL_PREFIX.match(ln):
+
+def find_saldo_final_from_lines(lines, lines_upper=None, saldo_idx=None):
+    """
+    Una sola pasada desde el final. Prioridad:
+    1) Macro/otros con formato expreso y fecha -> (fecha, saldo)
+    2) BNA: "SALDO FINAL" sin fecha -> (NaT, saldo)
+    """
+    if lines_upper is None:
+        lines_upper = [ln.upper() for ln in lines]
+    if saldo_idx is None:
+        saldo_idx = _saldo_line_idx(lines_upper)
+    sin_fecha = np.nan
+    for i in reversed(saldo_idx):
+        ln, U = lines[i], lines_upper[i]
+        saldo = _single_amount(ln)
+        if np.isnan(saldo):
+            continue
+        if SALDO_FINAL_PREFIX.match(U):
             d = DATE_RE.search(ln)
-            if d and _only_one_amount(ln):
+            if d:
                 fecha = pd.to_datetime(d.group(0), dayfirst=True, errors="coerce")
-                saldo = _first_amount_value(ln)
-                if pd.notna(fecha) and not np.isnan(saldo):
+                if pd.notna(fecha):
                     return fecha, saldo
-    # 2) BNA: "SALDO FINAL" sin fecha
-    for ln in reversed(lines):
-        if "SALDO FINAL" in ln.upper() and _only_one_amount(ln):
-            saldo = _first_amount_value(ln)
-            if not np.isnan(saldo):
-                return pd.NaT, saldo
-    return pd.NaT, np.nan
-
-
-def find_saldo_anterior_from_lines(lines):
-    # 1) Macro (expreso con fecha)
-    for ln in lines:
-        if SALDO_ANT_PREFIX.match(ln):
-            d = DATE_RE.search(ln)
-            if d and _only_one_amount(ln):
-                saldo = _first_amount_value(ln)
-                if not np.isnan(saldo):
-                    return saldo
-    # 2) Genérico: "SALDO ANTERIOR"
-    for ln in lines:
-        U = ln.upper()
-        if "SALDO ANTERIOR" in U and _only_one_amount(ln):
-            saldo = _first_amount_value(ln)
-            if not np.isnan(saldo):
-                return saldo
-    # 3) Macro variantes
-    for ln in lines:
-        U = ln.upper()
-        if "SALDO ULTIMO EXTRACTO" in U or "SALDO ÚLTIMO EXTRACTO" in U:
-            d = DATE_RE.search(ln)
-            if d and _only_one_amount(ln):
-                saldo = _first_amount_value(ln)
-                if not np.isnan(saldo):
-                    return saldo
-    # 4) Santa Fe — "SALDO ULTIMO RESUMEN"
-    for i, ln in enumerate(lines):
-        if SF_SALDO_ULT_RE.search(ln):
-            if _only_one_amount(ln):
-                v = _first_amount_value(ln)
+        if np.isnan(sin_fecha) and "SALDO FINAL" in U:
+            sin_fecha = saldo
+    return pd.NaT, sin_fecha
+
+
+def find_saldo_anterior_from_lines(lines, lines_upper=None, saldo_idx=None):
+    """
+    Un solo recorrido de las líneas. Prioridad (gana el primer valor válido del nivel más alto):
+    1) Macro expreso con fecha, 2) "SALDO ANTERIOR", 3) Macro variantes "SALDO ULTIMO EXTRACTO",
+    4) Santa Fe "SALDO ULTIMO RESUMEN" (solo la primera aparición; importe en la línea o en las 2 siguientes)
+    """
+    if lines_upper is None:
+        lines_upper = [ln.upper() for ln in lines]
+    if saldo_idx is None:
+        saldo_idx = _saldo_line_idx(lines_upper)  # todas las variantes contienen SALDO
+    found = [np.nan, np.nan, np.nan]  # niveles 2, 3 y 4
+    sf_seen = False
+    for i in saldo_idx:
+        ln, U = lines[i], lines_upper[i]
+        saldo = _single_amount(ln)
+        con_fecha = not np.isnan(saldo) and DATE_RE.search(ln) is not None
+        # 1) Macro (expreso con fecha): no hay nada de mayor prioridad
+        if con_fecha and SALDO_ANT_PREFIX.match(U):
+            return saldo
+        # 2) Genérico: "SALDO ANTERIOR"
+        if np.isnan(found[0]) and "SALDO ANTERIOR" in U:
+            found[0] = saldo
+        # 3) Macro variantes
+        if np.isnan(found[1]) and con_fecha and ("SALDO ULTIMO EXTRACTO" in U or "SALDO ÚLTIMO EXTRACTO" in U):
+            found[1] = saldo
+        # 4) Santa Fe — "SALDO ULTIMO RESUMEN"
+        if not sf_seen and SF_SALDO_ULT_RE.search(U):
+            sf_seen = True
+            for ln2 in (ln, *lines[i+1:i+3]):
+                v = _single_amount(ln2)
                 if not np.isnan(v):
-                    return v
-            for j in (i+1, i+2):
-                if 0 <= j < len(lines):
-                    ln2 = lines[j]
-                    if _only_one_amount(ln2):
-                        v2 = _first_amount_value(ln2)
-                        if not np.isnan(v2):
-                            return v2
-            break
+                    found[2] = v
+                    break
+    for v in found:
+        if not np.isnan(v):
+            return v
     return np.nan
 
 
 # ---------- Clasificación ----------
-RE_PERCEP_RG2408 = re.compile(r"PERCEPCI[ÓO]N\s+IVA\s+RG\.?\s*2408", re.IGNORECASE)
+RE_PERCEP_RG2408 = re.compile(r"PERCEPCI[ÓO]N\s+IVA\s+RG\.?\s*2408")
 
 
-def clasificar(desc: str, desc_norm: str, deb: float, cre: float) -> str:
-    u = (desc or "").upper()
-    n = (desc_norm or "").upper()
+def clasificar(u: str, n: str, deb: float, cre: float) -> str:
+    """
+    u: descripción en mayúsculas; n: descripción normalizada (normalize_desc ya la devuelve en mayúsculas).
+    """
 
     # Saldos
     if "SALDO ANTERIOR" in u or "SALDO ANTERIOR" in n:
@@ -553,6 +718,17 @@ def clasificar(desc: str, desc_norm: str, deb: float, cre: float) -> str:
     return "Otros"
 
 
+def clasificar_vec(desc_u: list[str], norm_u: list[str], deb: np.ndarray, cre: np.ndarray) -> list[str]:
+    """
+    Clasificación de toda la columna. clasificar solo mira (u, n, ¿débito≠0?, ¿crédito≠0?)
+    y en un extracto las descripciones se repiten mucho: se evalúa una vez por
+    combinación distinta y el resultado se reparte al resto de las filas.
+    """
+    keys = list(zip(desc_u, norm_u, (deb != 0).tolist(), (cre != 0).tolist()))
+    labels = {k: clasificar(*k) for k in dict.fromkeys(keys)}
+    return [labels[k] for k in keys]
+
+
 # ---------- Ajuste específico Macro: IVA 10,5% INTER.ADEL.CC + DEBITO FISCAL ----------
 def ajustar_macro_iva_105(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -564,40 +740,185 @@ def ajustar_macro_iva_105(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     df = df.copy()
-    u = df["desc_norm"].astype(str).str.upper()
+    u = df["desc_norm"].tolist()  # normalize_desc ya la deja en mayúsculas
     for i in range(len(df) - 1):
-        if "INTER.ADEL.CC" in u.iloc[i] and "C/ACUERD" in u.iloc[i]:
-            if "DEBITO FISCAL IVA BASICO" in u.iloc[i + 1]:
+        if "INTER.ADEL.CC" in u[i] and "C/ACUERD" in u[i]:
+            if "DEBITO FISCAL IVA BASICO" in u[i + 1]:
                 df.at[i + 1, "Clasificación"] = "IVA 10,5% (sobre comisiones)"
     return df
 
 
+# ---------- Totales por clasificación ----------
+def _sum_por_clase(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby("Clasificación", sort=False)[["debito", "credito"]].sum()
+
+
+def _clase_total(agg: pd.DataFrame, label: str, col: str = "debito") -> float:
+    return float(agg.at[label, col]) if label in agg.index else 0.0
+
+
+# ---------- Núcleo de cálculo por cuenta (memoizado en la sesión, ver render_account_report) ----------
+def _compute_account_report(banco_slug: str, lines: list[str]) -> dict:
+    """
+    Parseo, saldos, clasificación y totales de una cuenta, sin llamadas de UI.
+    """
+    lines_upper = [ln.upper() for ln in lines]
+    saldo_idx = _saldo_line_idx(lines_upper)
+    fecha_cierre, saldo_final_pdf = find_saldo_final_from_lines(lines, lines_upper, saldo_idx)
+    saldo_anterior = find_saldo_anterior_from_lines(lines, lines_upper, saldo_idx)
+    df = parse_lines(lines, lines_upper, saldo_anterior)  # con SALDO ANTERIOR ya al frente si existe
+
+    # Sin movimientos: solo saldos y conciliación
+    if df.empty:
+        total_debitos = 0.0
+        total_creditos = 0.0
+        saldo_inicial = float(saldo_anterior) if not np.isnan(saldo_anterior) else 0.0
+        saldo_final_visto = float(saldo_final_pdf) if not np.isnan(saldo_final_pdf) else saldo_inicial
+        saldo_final_calculado = saldo_inicial + total_creditos - total_debitos
+        diferencia = saldo_final_calculado - saldo_final_visto
+        return {
+            "df_sorted": None,
+            "fecha_cierre": fecha_cierre,
+            "saldo_inicial": saldo_inicial,
+            "total_debitos": total_debitos,
+            "total_creditos": total_creditos,
+            "saldo_final_visto": saldo_final_visto,
+            "saldo_final_calculado": saldo_final_calculado,
+            "diferencia": diferencia,
+            "cuadra": abs(diferencia) < 0.01,
+        }
+
+    # Débito/Crédito por delta de saldo
+    # (fecha, orden): si las fechas ya vienen crecientes (caso habitual) el orden ya es el final
+    if not df["fecha"].is_monotonic_increasing:
+        df = df.sort_values(["fecha", "orden"]).reset_index(drop=True)
+    s = df["saldo"].to_numpy(dtype=float)
+    delta = np.empty_like(s)
+    delta[0] = np.nan
+    np.subtract(s[1:], s[:-1], out=delta[1:])
+    deb = np.zeros_like(s)
+    cre = np.zeros_like(s)
+    np.negative(delta, out=deb, where=delta < 0)  # sin temporales -delta / np.where
+    np.copyto(cre, delta, where=delta > 0)
+    df[["delta_saldo", "debito", "credito", "importe"]] = np.column_stack([delta, deb, cre, deb - cre])  # importe: signo contable
+
+    # Clasificación
+    # parse_lines arma ambas columnas como str: un solo .upper() por fila y desc_norm tal cual
+    desc_u = [d.upper() for d in df["descripcion"]]
+    norm_u = df["desc_norm"].tolist()
+    df["Clasificación"] = clasificar_vec(desc_u, norm_u, deb, cre)
+
+    # Ajuste específico Macro: IVA 10,5% sobre INTER.ADEL.CC C/ACUERD
+    if banco_slug == "macro":
+        df = ajustar_macro_iva_105(df)
+
+    # Totales / conciliación
+    df_sorted = df.drop(columns=["orden"]).reset_index(drop=True)
+    saldo_inicial = float(df_sorted.loc[0, "saldo"])
+    total_debitos = float(df_sorted["debito"].sum())
+    total_creditos = float(df_sorted["credito"].sum())
+    saldo_final_visto = float(df_sorted["saldo"].iloc[-1]) if np.isnan(saldo_final_pdf) else float(saldo_final_pdf)
+    saldo_final_calculado = saldo_inicial + total_creditos - total_debitos
+    diferencia = saldo_final_calculado - saldo_final_visto
+    cuadra = abs(diferencia) < 0.01
+
+    # Débitos/créditos por clasificación: una sola agregación en vez de un escaneo por etiqueta
+    agg = _sum_por_clase(df_sorted)
+    iva21  = _clase_total(agg, "IVA 21% (sobre comisiones)")
+    iva105 = _clase_total(agg, "IVA 10,5% (sobre comisiones)")
+    net21  = round(iva21  / 0.21,  2) if iva21  else 0.0
+    net105 = round(iva105 / 0.105, 2) if iva105 else 0.0
+    percep_iva = _clase_total(agg, "Percepciones de IVA")
+    ley_25413  = _clase_total(agg, "LEY 25.413") - _clase_total(agg, "LEY 25.413", "credito")
+    sircreb    = _clase_total(agg, "SIRCREB")
+
+    # Detalle de créditos (préstamos)
+    credit_classes = ["Cuota de préstamo", "Acreditación Préstamos"]
+    df_creditos = df_sorted.loc[df_sorted["Clasificación"].isin(credit_classes)].copy()
+    total_cuotas = _clase_total(agg, "Cuota de préstamo")
+    total_acredit = _clase_total(agg, "Acreditación Préstamos", "credito")
+
+    return {
+        "df_sorted": df_sorted,
+        "fecha_cierre": fecha_cierre,
+        "saldo_inicial": saldo_inicial,
+        "total_debitos": total_debitos,
+        "total_creditos": total_creditos,
+        "saldo_final_visto": saldo_final_visto,
+        "saldo_final_calculado": saldo_final_calculado,
+        "diferencia": diferencia,
+        "cuadra": cuadra,
+        "iva21": iva21,
+        "iva105": iva105,
+        "net21": net21,
+        "net105": net105,
+        "percep_iva": percep_iva,
+        "ley_25413": ley_25413,
+        "sircreb": sircreb,
+        "df_creditos": df_creditos,
+        "total_cuotas": total_cuotas,
+        "total_acredit": total_acredit,
+    }
+
+
+def _resumen_operativo_pdf(datos: list[list[str]]) -> bytes:
+    """
+    PDF del Resumen Operativo (IVA). reportlab se importa recién acá; el llamador
+    lo memoiza en la sesión: los reruns de Streamlit no lo vuelven a armar.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
+    pdf_buf = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_buf, pagesize=A4, title="Resumen Operativo - Registración Módulo IVA")
+    styles = getSampleStyleSheet()
+    elems = []
+    elems.append(Paragraph("Resumen Operativo: Registración Módulo IVA", styles["Title"]))
+    elems.append(Spacer(1, 8))
+    tbl = Table(datos, colWidths=[300, 120])
+    tbl.setStyle(TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
+        ("TEXTCOLOR",  (0,0), (-1,0), colors.black),
+        ("GRID",       (0,0), (-1,-1), 0.3, colors.grey),
+        ("ALIGN",      (1,1), (1,-1), "RIGHT"),
+        ("FONTNAME",   (0,0), (-1,0), "Helvetica-Bold"),
+        ("FONTNAME",   (0,-1), (-1,-1), "Helvetica-Bold"),
+    ]))
+    elems.append(tbl)
+    elems.append(Spacer(1, 12))
+    elems.append(Paragraph("Herramienta para uso interno - AIE San Justo", styles["Normal"]))
+    doc.build(elems)
+    return pdf_buf.getvalue()
+
+
 # ---------- Helper de UI por cuenta (genérico) ----------
 def render_account_report(
+    parsed: dict,
     banco_slug: str,
     account_title: str,
     account_number: str,
     acc_id: str,
     lines: list[str],
-    bna_extras: dict | None = None   # actualmente no usado
+    bna_extras: dict | None = None   # actualmente no usado; importes None = no legibles
 ):
     st.markdown("---")
     st.subheader(f"{account_title} · Nro {account_number}")
 
-    df = parse_lines(lines)
-    fecha_cierre, saldo_final_pdf = find_saldo_final_from_lines(lines)
-    saldo_anterior = find_saldo_anterior_from_lines(lines)
+    # en la entrada del PDF en la sesión (no en st.cache_data, compartido entre usuarios)
+    r = _memo(parsed, ("report", banco_slug, tuple(lines)), _compute_account_report, banco_slug, lines)
+    df_sorted = r["df_sorted"]
+    fecha_cierre = r["fecha_cierre"]
+    saldo_inicial = r["saldo_inicial"]
+    total_debitos, total_creditos = r["total_debitos"], r["total_creditos"]
+    saldo_final_visto = r["saldo_final_visto"]
+    saldo_final_calculado = r["saldo_final_calculado"]
+    diferencia = r["diferencia"]
+    cuadra = r["cuadra"]
 
     # Sin movimientos: mostrar saldos y conciliación
-    if df.empty:
-        total_debitos = 0.0
-        total_creditos = 0.0
-        saldo_inicial = float(saldo_anterior) if not np.isnan(saldo_anterior) else 0.0
-        saldo_final_visto = float(saldo_final_pdf) if not np.isnan(saldo_final_pdf) else saldo_inicial
-        saldo_final_calculado = saldo_inicial + total_creditos - total_debitos
-        diferencia = saldo_final_calculado - saldo_final_visto
-        cuadra = abs(diferencia) < 0.01
-
+    if df_sorted is None:
         st.caption("Resumen del período")
         c1, c2, c3 = st.columns(3)
         with c1: metric_full("Saldo inicial", f"$ {fmt_ar(saldo_inicial)}")
@@ -617,49 +938,9 @@ def render_account_report(
         st.info("Sin Movimientos")
         return
 
-    # Con movimientos: insertar SALDO ANTERIOR si existe
-    if not np.isnan(saldo_anterior):
-        first_date = df["fecha"].dropna().min()
-        fecha_apertura = (first_date - pd.Timedelta(days=1)).normalize() + pd.Timedelta(hours=23, minutes=59, seconds=59) if pd.notna(first_date) else pd.NaT
-        apertura = pd.DataFrame([{
-            "fecha": fecha_apertura,
-            "descripcion": "SALDO ANTERIOR",
-            "desc_norm": "SALDO ANTERIOR",
-            "debito": 0.0,
-            "credito": 0.0,
-            "importe": 0.0,
-            "saldo": float(saldo_anterior),
-            "pagina": 0,
-            "orden": 0
-        }])
-        df = pd.concat([apertura, df], ignore_index=True)
-
-    # Débito/Crédito por delta de saldo
-    df = df.sort_values(["fecha", "orden"]).reset_index(drop=True)
-    df["delta_saldo"] = df["saldo"].diff()
-    df["debito"]  = np.where(df["delta_saldo"] < 0, -df["delta_saldo"], 0.0)
-    df["credito"] = np.where(df["delta_saldo"] > 0,  df["delta_saldo"], 0.0)
-    df["importe"] = df["debito"] - df["credito"]  # signo contable
-
-    # Clasificación
-    df["Clasificación"] = df.apply(
-        lambda r: clasificar(str(r.get("descripcion","")), str(r.get("desc_norm","")), r.get("debito",0.0), r.get("credito",0.0)),
-        axis=1
-    )
-
-    # Ajuste específico Macro: IVA 10,5% sobre INTER.ADEL.CC C/ACUERD
-    if banco_slug == "macro":
-        df = ajustar_macro_iva_105(df)
-
-    # Totales / conciliación
-    df_sorted = df.drop(columns=["orden"]).reset_index(drop=True)
-    saldo_inicial = float(df_sorted.loc[0, "saldo"])
-    total_debitos = float(df_sorted["debito"].sum())
-    total_creditos = float(df_sorted["credito"].sum())
-    saldo_final_visto = float(df_sorted["saldo"].iloc[-1]) if np.isnan(saldo_final_pdf) else float(saldo_final_pdf)
-    saldo_final_calculado = saldo_inicial + total_creditos - total_debitos
-    diferencia = saldo_final_calculado - saldo_final_visto
-    cuadra = abs(diferencia) < 0.01
+    iva21, iva105 = r["iva21"], r["iva105"]
+    net21, net105 = r["net21"], r["net105"]
+    percep_iva, ley_25413, sircreb = r["percep_iva"], r["ley_25413"], r["sircreb"]
 
     date_suffix = f"_{fecha_cierre.strftime('%Y%m%d')}" if pd.notna(fecha_cierre) else ""
     acc_suffix  = f"_{account_number}"
@@ -682,19 +963,6 @@ def render_account_report(
 
     # ===== Resumen Operativo (IVA + Otros) =====
     st.caption("Resumen Operativo: Registración Módulo IVA")
-    iva21_mask  = df_sorted["Clasificación"].eq("IVA 21% (sobre comisiones)")
-    iva105_mask = df_sorted["Clasificación"].eq("IVA 10,5% (sobre comisiones)")
-    iva21  = float(df_sorted.loc[iva21_mask,  "debito"].sum())
-    iva105 = float(df_sorted.loc[iva105_mask, "debito"].sum())
-    net21  = round(iva21  / 0.21,  2) if iva21  else 0.0
-    net105 = round(iva105 / 0.105, 2) if iva105 else 0.0
-    percep_iva = float(df_sorted.loc[df_sorted["Clasificación"].eq("Percepciones de IVA"), "debito"].sum())
-    ley_25413_mask = df_sorted["Clasificación"].eq("LEY 25.413")
-    ley_25413_debitos  = float(df_sorted.loc[ley_25413_mask, "debito"].sum())
-    ley_25413_creditos = float(df_sorted.loc[ley_25413_mask, "credito"].sum())
-    ley_25413  = ley_25413_debitos - ley_25413_creditos
-    sircreb    = float(df_sorted.loc[df_sorted["Clasificación"].eq("SIRCREB"),            "debito"].sum())
-
     # Métricas IVA
     m1, m2, m3 = st.columns(3)
     with m1: st.metric("Neto Comisiones 21%", f"$ {fmt_ar(net21)}")
@@ -713,24 +981,18 @@ def render_account_report(
 
     # Tabla (grilla) con números formateados
     st.caption("Detalle de movimientos")
-    df_view = df_sorted.copy()
-    for c in ["debito", "credito", "importe", "saldo"]:
-        if c in df_view.columns:
-            df_view[c] = df_view[c].map(fmt_ar)
-    st.dataframe(df_view, use_container_width=True)
+    st.dataframe(money_view(df_sorted), use_container_width=True)
 
     # ===== Detalle de créditos (préstamos) =====
     st.caption("Detalle de créditos (préstamos)")
 
-    credit_classes = ["Cuota de préstamo", "Acreditación Préstamos"]
-    df_creditos = df_sorted.loc[df_sorted["Clasificación"].isin(credit_classes)].copy()
+    df_creditos = r["df_creditos"]
 
     if df_creditos.empty:
         st.info("Sin movimientos de créditos/préstamos en el período.")
     else:
         # Resumen
-        total_cuotas = float(df_creditos.loc[df_creditos["Clasificación"].eq("Cuota de préstamo"), "debito"].sum())
-        total_acredit = float(df_creditos.loc[df_creditos["Clasificación"].eq("Acreditación Préstamos"), "credito"].sum())
+        total_cuotas, total_acredit = r["total_cuotas"], r["total_acredit"]
         neto_creditos = total_acredit - total_cuotas
 
         k1, k2, k3 = st.columns(3)
@@ -739,11 +1001,7 @@ def render_account_report(
         with k3: metric_full("Neto (acreditado – cuotas)", f"$ {fmt_ar(neto_creditos)}")
 
         # Grilla (formateada)
-        df_creditos_view = df_creditos.copy()
-        for c in ["debito", "credito", "importe", "saldo"]:
-            if c in df_creditos_view.columns:
-                df_creditos_view[c] = df_creditos_view[c].map(fmt_ar)
-        st.dataframe(df_creditos_view, use_container_width=True)
+        st.dataframe(money_view(df_creditos), use_container_width=True)
 
         # Descarga (Excel con fallback CSV) — sufijos calculados localmente para evitar UnboundLocalError
         st.caption("Descargar detalle de créditos (préstamos)")
@@ -838,12 +1096,6 @@ def render_account_report(
 
     if REPORTLAB_OK:
         try:
-            pdf_buf = io.BytesIO()
-            doc = SimpleDocTemplate(pdf_buf, pagesize=A4, title="Resumen Operativo - Registración Módulo IVA")
-            styles = getSampleStyleSheet()
-            elems = []
-            elems.append(Paragraph("Resumen Operativo: Registración Módulo IVA", styles["Title"]))
-            elems.append(Spacer(1, 8))
             datos = [
                 ["Concepto", "Importe"],
                 ["Neto Comisiones 21%",  fmt_ar(net21)],
@@ -858,23 +1110,9 @@ def render_account_report(
             ]
             datos.append(["TOTAL", fmt_ar(net21 + iva21 + net105 + iva105 + percep_iva + ley_25413 + sircreb)])
 
-            tbl = Table(datos, colWidths=[300, 120])
-            tbl.setStyle(TableStyle([
-                ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
-                ("TEXTCOLOR",  (0,0), (-1,0), colors.black),
-                ("GRID",       (0,0), (-1,-1), 0.3, colors.grey),
-                ("ALIGN",      (1,1), (1,-1), "RIGHT"),
-                ("FONTNAME",   (0,0), (-1,0), "Helvetica-Bold"),
-                ("FONTNAME",   (0,-1), (-1,-1), "Helvetica-Bold"),
-            ]))
-            elems.append(tbl)
-            elems.append(Spacer(1, 12))
-            elems.append(Paragraph("Herramienta para uso interno - AIE San Justo", styles["Normal"]))
-
-            doc.build(elems)
             st.download_button(
                 "📄 Descargar PDF – Resumen Operativo (IVA)",
-                data=pdf_buf.getvalue(),
+                data=_memo(parsed, ("pdf_iva", tuple(map(tuple, datos))), _resumen_operativo_pdf, datos),
                 file_name=f"Resumen_Operativo_IVA_{banco_slug}{acc_suffix}{date_suffix}.pdf",
                 mime="application/pdf",
                 use_container_width=True,
@@ -885,48 +1123,43 @@ def render_account_report(
 
 
 # ---------- Banco Santa Fe: extraer Nro de cuenta desde “Consolidado de cuentas” ----------
-def santafe_extract_accounts(file_like):
+def santafe_extract_accounts(all_lines):
     """
-    Busca líneas tipo: 'Cuenta Corriente Pesos Nro. 1646/00'
-    Devuelve lista de dicts [{'title': 'Cuenta Corriente Pesos', 'nro': '1646/00'}]
+    Busca líneas tipo: 'Cuenta Corriente Pesos Nro. 1646/00' en los pares (página, línea)
+    Devuelve lista de tuplas [('Cuenta Corriente Pesos', '1646/00')] (título, nro)
     """
     items = []
-    for _, ln in extract_all_lines(file_like):
+    for _, ln in all_lines:
         m = SF_ACC_LINE_RE.search(ln)
         if m:
             title = " ".join(m.group(1).split())
             nro   = m.group(2).strip()
-            items.append({"title": title.title(), "nro": nro})
+            items.append((title.title(), nro))
     # quitar duplicados preservando orden
-    seen = set()
-    uniq = []
-    for it in items:
-        key = (it["title"], it["nro"])
-        if key not in seen:
-            seen.add(key)
-            uniq.append(it)
-    return uniq
+    return list(dict.fromkeys(items))
 
 
 # ---------- Banco Nación: meta (Cuenta/CBU/Período) + gastos finales ----------
+# Reciben siempre str (el llamador pasa _bank_txt, ya normalizado); regex BNA precompiladas arriba.
+def _money_or_none(tok: str) -> float | None:
+    v = normalize_money(tok)
+    return None if v != v else v  # NaN -> None (faltante en un dict común)
+
+
 def bna_extract_gastos_finales(txt: str) -> dict:
-    out = {}
-    for m in BNA_GASTOS_RE.finditer(txt or ""):
-        etiqueta = m.group(1).upper()
-        importe = normalize_money(m.group(2))
-        if "I.V.A" in etiqueta or "IVA" in etiqueta:
-            etiqueta = "I.V.A. BASE"
-        out[etiqueta] = float(importe) if importe is not None else np.nan
-    return out
+    # el grupo 'iva' ya identifica la variante de I.V.A. BASE; ante repetidos gana el último
+    return {
+        ("I.V.A. BASE" if m["iva"] else m["lbl"].upper()): _money_or_none(m["imp"])
+        for m in BNA_GASTOS_RE.finditer(txt)
+    }
 
 
-def bna_extract_meta(file_like):
+def bna_extract_meta(txt: str):
     """
-    Lee el texto completo y devuelve dict con:
+    Recibe el texto completo y devuelve dict con:
     {'account_number': str|None, 'cbu': str|None, 'period_start': str|None, 'period_end': str|None}
     - Soporta caja larga (Cuenta+CBU) y variante corta de "NRO. CUENTA SUCURSAL"
     """
-    txt = _text_from_pdf(file_like)
     acc = cbu = pstart = pend = None
 
     mper = BNA_PERIODO_RE.search(txt)
@@ -944,15 +1177,129 @@ def bna_extract_meta(file_like):
     return {"account_number": acc, "cbu": cbu, "period_start": pstart, "period_end": pend}
 
 
+# ---------- Flujo por banco ----------
+def _safe_id(nro: str) -> str:
+    return ID_UNSAFE_RE.sub("_", nro)
+
+
+# Todos reciben (slug, entrada del PDF en la sesión, texto completo, pares (página, línea), líneas)
+def _render_macro(bank_slug, parsed, bank_txt, line_pairs, lines):
+    blocks = _memo(parsed, "macro_blocks", macro_split_account_blocks, line_pairs)
+    if not blocks:
+        st.warning("No se detectaron encabezados de cuenta en Macro. Se intentará procesar todo el PDF (podría mezclar cuentas).")
+        render_account_report(parsed, bank_slug, "CUENTA (PDF completo)", "s/n", "macro-pdf-completo", lines)
+    else:
+        st.caption(f"Información de su/s Cuenta/s: {len(blocks)} cuenta(s) detectada(s).")
+        for b in blocks:
+            render_account_report(parsed, bank_slug, b["titulo"], b["nro"], b["acc_id"], b["lines"])
+
+
+def _render_santafe(bank_slug, parsed, bank_txt, line_pairs, lines):
+    sf_accounts = _memo(parsed, "santafe_accounts", santafe_extract_accounts, line_pairs)
+
+    if sf_accounts:
+        st.caption(f"Consolidado de cuentas: {len(sf_accounts)} detectada(s).")
+        for i, (title, nro) in enumerate(sf_accounts):
+            if i:
+                st.markdown("")  # separador entre cuentas (no después de la última)
+            acc_id = f"santafe-{_safe_id(nro)}"
+            render_account_report(parsed, bank_slug, title, nro, acc_id, lines)
+    else:
+        render_account_report(parsed, bank_slug, "CUENTA", "s/n", "generica-unica", lines)
+
+
+def _render_nacion(bank_slug, parsed, bank_txt, line_pairs, lines):
+    meta = _memo(parsed, "bna_meta", bna_extract_meta, bank_txt)
+    titulo = "CUENTA (BNA)"
+    nro = meta.get("account_number") or "s/n"
+    acc_id = f"bna-{_safe_id(nro)}"
+
+    # Meta visible
+    col1, col2, col3 = st.columns(3)
+    if meta.get("period_start") and meta.get("period_end"):
+        with col1: st.caption(f"Período: {meta['period_start']} al {meta['period_end']}")
+    if meta.get("account_number"):
+        with col2: st.caption(f"Nro. de cuenta: {meta['account_number']}")
+    if meta.get("cbu"):
+        with col3: st.caption(f"CBU: {meta['cbu']}")
+
+    # Extras BNA -> integrados al Resumen Operativo (por ahora solo se leen)
+    bna_extras = _memo(parsed, "bna_gastos", bna_extract_gastos_finales, bank_txt)
+
+    render_account_report(parsed, bank_slug, titulo, nro, acc_id, lines, bna_extras=bna_extras)
+
+
+def _render_generico(bank_slug, parsed, bank_txt, line_pairs, lines):
+    # Desconocido: procesar genérico
+    render_account_report(parsed, bank_slug, "CUENTA", "s/n", "generica-unica", lines)
+
+
+# nombre visible -> (slug, renderer); el orden es el del selector "Forzar identificación"
+BANKS = {
+    "Banco de Santa Fe":            ("santafe", _render_santafe),
+    "Banco Macro":                  ("macro",   _render_macro),
+    "Banco de la Nación Argentina": ("nacion",  _render_nacion),
+}
+
+
+# ---------- caché por contenido del PDF ----------
+def _parse_pdf_once(data: bytes) -> dict:
+    """
+    Extrae texto y líneas en una sola apertura del PDF (extract_text una vez por
+    página), guardado en st.session_state con clave blake2b del contenido: los reruns
+    (cambiar un selectbox, descargar) y las re-subidas del mismo PDF no lo vuelven a abrir.
+    """
+    key = f"parsed_{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+    parsed = st.session_state.get(key)
+    if parsed is None:
+        # solo el último PDF: no acumular archivos en la sesión
+        for k in [k for k in st.session_state if str(k).startswith("parsed_")]:
+            del st.session_state[k]
+        texts = []
+        try:
+            lines = list(iter_all_lines(io.BytesIO(data), texts))
+        except Exception:
+            texts, lines = [], []  # PDF ilegible: se informa como sin texto
+        parsed = {"key": key, "text": "\n".join(texts), "lines": lines}
+        st.session_state[key] = parsed
+    return parsed
+
+
+def _clear_text_caches() -> None:
+    """Vacía los lru_cache que guardan líneas, descripciones o importes."""
+    for fn in (_money_tokens, normalize_desc, normalize_money):
+        fn.cache_clear()
+
+
+def _memo(parsed: dict, name, fn, *args):
+    """Calcula fn(*args) una sola vez por PDF y lo guarda en su entrada de la sesión (name: clave hashable)."""
+    if name not in parsed:
+        parsed[name] = fn(*args)
+    return parsed[name]
+
+
 # ---------- UI principal ----------
 uploaded = st.file_uploader("Subí un PDF del resumen bancario", type=["pdf"])
 if uploaded is None:
     st.info("La app no almacena datos, toda la información está protegida.")
     st.stop()
 
-data = uploaded.read()
+# --- deps diferidas: se cargan recién con un PDF subido (la pantalla inicial no las necesita) ---
+try:
+    import pdfplumber
+except Exception as e:
+    if not PYMUPDF_OK:  # sin ningún motor no hay cómo leer el PDF
+        st.error(f"No se pudo importar pdfplumber: {e}\nRevisá requirements.txt")
+        st.stop()
+
+# Para PDF del “Resumen Operativo: Registración Módulo IVA”: acá solo se verifica que
+# reportlab esté instalado; el import real lo hace _resumen_operativo_pdf al armar el PDF
+REPORTLAB_OK = importlib.util.find_spec("reportlab") is not None
 
-_bank_txt = _text_from_pdf(io.BytesIO(data)).strip()
+data = uploaded.getvalue()
+_parsed = _parse_pdf_once(data)
+
+_bank_txt = _parsed["text"].strip()  # único texto completo del PDF: detección + meta/extras BNA
 
 # Si no hay texto, probablemente sea un PDF escaneado (solo imagen)
 if not _bank_txt:
@@ -964,84 +1311,31 @@ if not _bank_txt:
     )
     st.stop()
 
-_auto_bank_name = detect_bank_from_text(_bank_txt)
+_auto_bank_name = _memo(_parsed, "bank", detect_bank_from_text, _bank_txt)
 
 with st.expander("Opciones avanzadas (detección de banco)", expanded=False):
     forced = st.selectbox(
         "Forzar identificación del banco",
-        options=("Auto (detectar)", "Banco de Santa Fe", "Banco Macro", "Banco de la Nación Argentina"),
+        options=("Auto (detectar)", *BANKS),
         index=0,
         help="Solo cambia la etiqueta informativa y el nombre de archivo."
     )
 
 _bank_name = forced if forced != "Auto (detectar)" else _auto_bank_name
 
-if _bank_name == "Banco Macro":
-    st.info(f"Detectado: {_bank_name}")
-elif _bank_name == "Banco de Santa Fe":
-    st.success(f"Detectado: {_bank_name}")
-elif _bank_name == "Banco de la Nación Argentina":
-    st.success(f"Detectado: {_bank_name}")
+if _bank_name in BANKS:
+    (st.info if _bank_name == "Banco Macro" else st.success)(f"Detectado: {_bank_name}")
 else:
     st.warning("No se pudo identificar el banco automáticamente. Se intentará procesar.")
 
-_bank_slug = ("macro" if _bank_name == "Banco Macro"
-              else "santafe" if _bank_name == "Banco de Santa Fe"
-              else "nacion" if _bank_name == "Banco de la Nación Argentina"
-              else "generico")
+_bank_slug, _render_bank = BANKS.get(_bank_name, ("generico", _render_generico))
 
-# --- Flujo por banco ---
-if _bank_name == "Banco Macro":
-    blocks = macro_split_account_blocks(io.BytesIO(data))
-    if not blocks:
-        st.warning("No se detectaron encabezados de cuenta en Macro. Se intentará procesar todo el PDF (podría mezclar cuentas).")
-        _lines = [l for _, l in extract_all_lines(io.BytesIO(data))]
-
-        render_account_report(_bank_slug, "CUENTA (PDF completo)", "s/n", "macro-pdf-completo", _lines)
-    else:
-        st.caption(f"Información de su/s Cuenta/s: {len(blocks)} cuenta(s) detectada(s).")
-        for b in blocks:
-            render_account_report(_bank_slug, b["titulo"], b["nro"], b["acc_id"], b["lines"])
-
-elif _bank_name == "Banco de Santa Fe":
-    sf_accounts = santafe_extract_accounts(io.BytesIO(data))
-    all_lines = [l for _, l in extract_all_lines(io.BytesIO(data))]
+# Líneas del PDF: una sola extracción, compartida por todas las ramas
+_all_line_pairs = _parsed["lines"]
+_all_lines = _memo(_parsed, "line_texts", lambda: [l for _, l in _all_line_pairs])
 
-    if sf_accounts:
-        st.caption(f"Consolidado de cuentas: {len(sf_accounts)} detectada(s).")
-        for i, acc in enumerate(sf_accounts, start=1):
-            title = acc["title"]
-            nro   = acc["nro"]
-            acc_id = f"santafe-{re.sub(r'[^0-9A-Za-z]+', '_', nro)}"
-            render_account_report(_bank_slug, title, nro, acc_id, all_lines)
-            if i < len(sf_accounts):
-                st.markdown("")
-    else:
-        render_account_report(_bank_slug, "CUENTA", "s/n", "generica-unica", all_lines)
-
-elif _bank_name == "Banco de la Nación Argentina":
-    meta = bna_extract_meta(io.BytesIO(data))
-    all_lines = [l for _, l in extract_all_lines(io.BytesIO(data))]
-    titulo = "CUENTA (BNA)"
-    nro = meta.get("account_number") or "s/n"
-    acc_id = f"bna-{re.sub(r'[^0-9A-Za-z]+', '_', nro)}"
-
-    # Meta visible
-    col1, col2, col3 = st.columns(3)
-    if meta.get("period_start") and meta.get("period_end"):
-        with col1: st.caption(f"Período: {meta['period_start']} al {meta['period_end']}")
-    if meta.get("account_number"):
-        with col2: st.caption(f"Nro. de cuenta: {meta['account_number']}")
-    if meta.get("cbu"):
-        with col3: st.caption(f"CBU: {meta['cbu']}")
-
-    # Extras BNA -> integrados al Resumen Operativo (por ahora solo se leen)
-    txt_full = _text_from_pdf(io.BytesIO(data))
-    bna_extras = bna_extract_gastos_finales(txt_full)
-
-    render_account_report(_bank_slug, titulo, nro, acc_id, all_lines, bna_extras=bna_extras)
-
-else:
-    # Desconocido: procesar genérico
-    all_lines = [l for _, l in extract_all_lines(io.BytesIO(data))]
-    render_account_report(_bank_slug, "CUENTA", "s/n", "generica-unica", all_lines)
+# --- Flujo por banco ---
+try:
+    _render_bank(_bank_slug, _parsed, _bank_txt, _all_line_pairs, _all_lines)
+finally:
+    _clear_text_caches()  # los lru_cache son del proceso: que no retengan texto del resumen entre sesiones
@@ -0,0 +1,40 @@
+"""
+La app es un único script de Streamlit: para probar sus funciones se ejecuta
+todo lo que está antes de la UI principal (sin file_uploader ni st.stop()).
+"""
+from pathlib import Path
+import sys
+import types
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+UI_MARK = "# ---------- UI principal ----------"
+
+
+@pytest.fixture(scope="session")
+def app():
+    import pdfplumber
+
+    src = (ROOT / "ia_resumen_bancario.py").read_text(encoding="utf-8")
+    mod = types.ModuleType("ia_resumen_bancario")
+    mod.__file__ = str(ROOT / "ia_resumen_bancario.py")
+    sys.modules[mod.__name__] = mod  # lo necesita @dataclass, si lo hubiera
+    exec(compile(src.split(UI_MARK, 1)[0], mod.__file__, "exec"), mod.__dict__)
+    mod.pdfplumber = pdfplumber  # dep diferida de la UI
+    return mod
+
+
+@pytest.fixture
+def plumber(app, monkeypatch):
+    """La app forzada a extraer con pdfplumber, esté o no PyMuPDF."""
+    monkeypatch.setattr(app, "PYMUPDF_OK", False)
+    return app
+
+
+@pytest.fixture
+def fixture_pdf():
+    def _open(name):
+        return open(FIXTURES / name, "rb")
+    return _open
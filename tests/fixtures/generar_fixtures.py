@@ -0,0 +1,86 @@
+"""
+Genera los PDF de prueba de tests/fixtures (requiere reportlab).
+Uso: python tests/fixtures/generar_fixtures.py
+"""
+from pathlib import Path
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+HERE = Path(__file__).parent
+
+MOVIMIENTOS = [
+    "02/01/24 TRANSF RECIB 30712345678 1.500,00 2.500,00",
+    "03/01/24 IMPTRANS 9,00 2.491,00",
+    "04/01/24 COMIS.TRANSF 120,00 2.371,00",
+    "05/01/24 IVA GRAL 25,20 2.345,80",
+    "08/01/24 SIRCREB 30,00 2.315,80",
+    "09/01/24 DEB.CUOTA PRESTAMO 800,00 1.515,80",
+    "10/01/24 CR-DEPEF 2.000,00 3.515,80",
+    "11/01/24 PERCEPCION IVA RG 2408 40,00 3.475,80",
+]
+
+
+def _pagina(c, lineas, y=800, paso=12):
+    c.setFont("Helvetica", 8)
+    for ln in lineas:
+        c.drawString(30, y, ln)
+        y -= paso
+    return y
+
+
+def resumen_generico(path):
+    """Resumen simple, con renglones bien separados: los dos motores leen lo mismo."""
+    c = canvas.Canvas(str(path), pagesize=A4, invariant=1)  # bytes reproducibles
+    _pagina(c, ["ALGUN BANCO", "FECHA DESCRIPCION DEBITO CREDITO SALDO", "SALDO ANTERIOR 1.000,00",
+                *MOVIMIENTOS, "SALDO FINAL 3.475,80"])
+    c.showPage()
+    c.save()
+
+
+def movimiento_solapado(path):
+    """
+    Página donde dos movimientos quedan a 2,5 pt de altura: extract_text los
+    mezcla carácter a carácter.
+    """
+    c = canvas.Canvas(str(path), pagesize=A4, invariant=1)  # bytes reproducibles
+    y = _pagina(c, ["ALGUN BANCO", "FECHA DESCRIPCION DEBITO CREDITO SALDO", "SALDO ANTERIOR 1.000,00",
+                    *MOVIMIENTOS])
+    c.drawString(30, y, "12/01/24 TRANSF RECIB 20123456789 1.000,00 4.475,80")
+    c.drawString(30, y - 2.5, "15/01/24 DEB.AUTOM SEGURO 150,00 4.325,80")
+    c.showPage()
+    c.save()
+
+
+def fuentes_mezcladas(path):
+    """Fecha y detalle en 8 pt y los importes en 11 pt negrita, sobre la misma línea base."""
+    c = canvas.Canvas(str(path), pagesize=A4, invariant=1)  # bytes reproducibles
+    y = _pagina(c, ["ALGUN BANCO", "FECHA DESCRIPCION DEBITO CREDITO SALDO", "SALDO ANTERIOR 1.000,00"])
+    for fecha, detalle, importes in (("02/01/24", "TRANSF RECIB", "1.500,00 2.500,00"),
+                                     ("03/01/24", "IMPTRANS", "9,00 2.491,00")):
+        c.setFont("Helvetica", 8)
+        c.drawString(30, y, f"{fecha} {detalle}")
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(200, y, importes)
+        y -= 16
+    c.showPage()
+    c.save()
+
+
+def hueco_angosto(path):
+    """Fecha y detalle dibujados por separado, a 2,5 pt: pdfplumber los lee como una palabra."""
+    c = canvas.Canvas(str(path), pagesize=A4, invariant=1)  # bytes reproducibles
+    y = _pagina(c, ["ALGUN BANCO", "SALDO ANTERIOR 1.000,00"])
+    c.setFont("Helvetica", 8)
+    fecha = "02/01/24"
+    c.drawString(30, y, fecha)
+    c.drawString(30 + c.stringWidth(fecha, "Helvetica", 8) + 2.5, y, "TRANSF RECIB 1.500,00 2.500,00")
+    c.showPage()
+    c.save()
+
+
+if __name__ == "__main__":
+    resumen_generico(HERE / "resumen_generico.pdf")
+    movimiento_solapado(HERE / "movimiento_solapado.pdf")
+    fuentes_mezcladas(HERE / "fuentes_mezcladas.pdf")
+    hueco_angosto(HERE / "hueco_angosto.pdf")
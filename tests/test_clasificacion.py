@@ -0,0 +1,52 @@
+import numpy as np
+
+CASOS = [
+    # (descripción, débito, crédito, clasificación)
+    ("SALDO ANTERIOR", 0.0, 0.0, "SALDO ANTERIOR"),
+    ("IMPTRANS", 9.0, 0.0, "LEY 25.413"),
+    ("N/D DBCR 25413 S/CRED", 3.0, 0.0, "LEY 25.413"),
+    ("SIRCREB", 30.0, 0.0, "SIRCREB"),
+    ("PERCEPCION IVA RG 2408", 40.0, 0.0, "Percepciones de IVA"),
+    ("IVA RINS IVA REDUC.R.I.", 5.0, 0.0, "IVA 10,5% (sobre comisiones)"),
+    ("IVA GRAL", 25.2, 0.0, "IVA 21% (sobre comisiones)"),
+    ("I.V.A. BASE 10,5", 4.0, 0.0, "IVA 10,5% (sobre comisiones)"),
+    ("PLAZO FIJO", 0.0, 1000.0, "Acreditación Plazo Fijo"),
+    ("PLAZO FIJO", 1000.0, 0.0, "Débito Plazo Fijo"),
+    ("COMIS.TRANSF", 120.0, 0.0, "Gastos por comisiones"),
+    ("DB-SNP SEGUROS", 150.0, 0.0, "Débito automático"),
+    ("DEB.CUOTA PRESTAMO", 800.0, 0.0, "Cuota de préstamo"),
+    ("CR.PREST", 0.0, 5000.0, "Acreditación Préstamos"),
+    ("SAN JUS PAGO COMERC 12345678", 0.0, 700.0, "Acreditaciones Tarjetas de Crédito/Débito"),
+    ("CR-DEPEF", 0.0, 2000.0, "Depósito en Efectivo"),
+    ("TRANSF RECIB 30712345678", 0.0, 1500.0, "Transferencia de terceros recibida"),
+    ("TRANSF RECIB 30712345678", 1500.0, 0.0, "Débito"),
+    ("ALGO", 0.0, 0.0, "Otros"),
+]
+
+
+def _vec(app, casos):
+    desc = [c[0] for c in casos]
+    desc_u = [d.upper() for d in desc]
+    norm_u = [app.normalize_desc(d) for d in desc]
+    deb = np.array([c[1] for c in casos])
+    cre = np.array([c[2] for c in casos])
+    return app.clasificar_vec(desc_u, norm_u, deb, cre)
+
+
+def test_clasificaciones(app):
+    assert _vec(app, CASOS) == [c[3] for c in CASOS]
+
+
+def test_filas_repetidas_reciben_su_propia_clasificacion(app):
+    # la misma descripción con distinto signo no comparte resultado
+    casos = CASOS * 3
+    assert _vec(app, casos) == [c[3] for c in casos]
+
+
+def test_igual_que_clasificar_fila_por_fila(app):
+    desc_u = [c[0].upper() for c in CASOS]
+    norm_u = [app.normalize_desc(c[0]) for c in CASOS]
+    deb = np.array([c[1] for c in CASOS])
+    cre = np.array([c[2] for c in CASOS])
+    esperado = [app.clasificar(u, n, d, c) for u, n, d, c in zip(desc_u, norm_u, deb, cre)]
+    assert app.clasificar_vec(desc_u, norm_u, deb, cre) == esperado
@@ -0,0 +1,56 @@
+def _pares(lines):
+    return [(1, l) for l in lines]
+
+
+def test_santafe_cuentas_en_orden_y_sin_repetidos(app):
+    lines = [
+        "NUEVO BANCO DE SANTA FE",
+        "Consolidado de cuentas",
+        "Cuenta Corriente Pesos Nro. 1646/00 Caja de Ahorro Pesos Nro. 22/01",
+        "CAJA DE AHORRO EN DOLARES NRO 33/02",
+        "Cuenta Corriente Pesos Nro. 1646/00",
+        "02/01/24 TRANSF RECIB 1.500,00 2.500,00",
+    ]
+    assert app.santafe_extract_accounts(_pares(lines)) == [
+        ("Cuenta Corriente Pesos", "1646/00"),  # una sola cuenta por línea: la primera
+        ("Caja De Ahorro En Dolares", "33/02"),
+    ]
+
+
+def test_santafe_sin_cuentas(app):
+    assert app.santafe_extract_accounts(_pares(["SALDO ANTERIOR 100,00"])) == []
+
+
+MACRO_LINES = [
+    "BANCO MACRO S.A.",
+    "INFORMACIÓN DE SU/S CUENTA/S",
+    "CUENTA CORRIENTE ESPECIAL PESOS 3 – 123 – 0000000003 – 4",  # guion largo con espacios
+    "CUENTA CORRIENTE ESPECIAL DOLARES 3−123−0000000007−8",      # signo menos
+    "CUENTA CORRIENTE ESPECIAL PESOS NRO:",                      # fin de la tabla
+    "3‑123‑0000000003‑4",                                        # guion no separable
+    "02/01/24 TRANSF RECIB 1.500,00 2.500,00",
+    "CUENTA CORRIENTE ESPECIAL DOLARES NRO.: 3 - 123 - 0000000007 - 8",
+    "03/01/24 COMISION 10,00 990,00",
+]
+
+
+def test_macro_whitelist_con_guiones_unicode(app):
+    assert app.macro_extract_account_whitelist(_pares(MACRO_LINES)) == {
+        "3-123-0000000003-4": {"titulo": "CUENTA CORRIENTE ESPECIAL EN PESOS"},
+        "3-123-0000000007-8": {"titulo": "CUENTA CORRIENTE ESPECIAL EN DOLARES"},
+    }
+
+
+def test_macro_bloques_por_numero_normalizado(app):
+    blocks = app.macro_split_account_blocks(_pares(MACRO_LINES))
+    assert [(b["nro"], b["titulo"]) for b in blocks] == [
+        ("3-123-0000000003-4", "CUENTA CORRIENTE ESPECIAL EN PESOS"),
+        ("3-123-0000000007-8", "CUENTA CORRIENTE ESPECIAL EN DOLARES"),
+    ]
+    assert blocks[0]["lines"] == ["02/01/24 TRANSF RECIB 1.500,00 2.500,00"]
+    assert blocks[1]["lines"] == ["03/01/24 COMISION 10,00 990,00"]
+
+
+def test_macro_sin_guion_no_hay_cuenta(app):
+    lines = ["INFORMACIÓN DE SU/S CUENTA/S", "CUENTA CORRIENTE ESPECIAL PESOS 3 123 0000000003 4"]
+    assert app.macro_extract_account_whitelist(_pares(lines)) == {}
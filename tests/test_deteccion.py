@@ -0,0 +1,31 @@
+import random
+
+
+def _detect_original(app, txt):
+    # la detección del script original: cantidad de hints presentes, empate por orden
+    U = txt.upper()
+    scores = [
+        ("Banco Macro", sum(1 for k in app.BANK_MACRO_HINTS if k in U)),
+        ("Banco de Santa Fe", sum(1 for k in app.BANK_SANTAFE_HINTS if k in U)),
+        ("Banco de la Nación Argentina", sum(1 for k in app.BANK_NACION_HINTS if k in U)),
+    ]
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores[0][0] if scores[0][1] > 0 else "Banco no identificado"
+
+
+def test_empate_no_lo_decide_la_frecuencia(app):
+    txt = "I.V.A. BASE I.V.A. BASE BANCO DE SANTA FE SALDO ANTERIOR"
+    assert app.detect_bank_from_text(txt) == "Banco de Santa Fe"
+
+
+def test_sin_hints(app):
+    assert app.detect_bank_from_text("") == "Banco no identificado"
+    assert app.detect_bank_from_text("ALGUN BANCO") == "Banco no identificado"
+
+
+def test_igual_que_la_deteccion_original(app):
+    hints = sorted({*app.BANK_MACRO_HINTS, *app.BANK_SANTAFE_HINTS, *app.BANK_NACION_HINTS})
+    r = random.Random(0)
+    for _ in range(2000):
+        txt = " ".join(r.choice(hints) for _ in range(r.randint(0, 8)))
+        assert app.detect_bank_from_text(txt) == _detect_original(app, txt), txt
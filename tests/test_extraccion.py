@@ -0,0 +1,65 @@
+import pdfplumber
+import pytest
+
+
+def _lineas(app, pdf, page_texts=None):
+    return [l for _, l in app.iter_all_lines(pdf, page_texts)]
+
+
+def _extraer(app, fixture_pdf, name):
+    page_texts = []
+    with fixture_pdf(name) as f:
+        lines = _lineas(app, f, page_texts)
+    return lines, page_texts
+
+
+def test_una_sola_extraccion_por_pagina(plumber, fixture_pdf, monkeypatch):
+    # Solo las líneas de extract_text: extract_words ya no se llama
+    def _no(self, *a, **k):
+        raise AssertionError("extract_words")
+
+    monkeypatch.setattr(pdfplumber.page.Page, "extract_words", _no)
+    with fixture_pdf("movimiento_solapado.pdf") as f, pdfplumber.open(f) as pdf:
+        esperado = [l for l in plumber.lines_from_text(pdf.pages[0]) if l.strip()]
+    lines, _ = _extraer(plumber, fixture_pdf, "movimiento_solapado.pdf")
+    assert lines == esperado
+
+
+def test_page_texts_es_el_texto_de_extract_text(plumber, fixture_pdf):
+    with fixture_pdf("resumen_generico.pdf") as f, pdfplumber.open(f) as pdf:
+        esperado = [p.extract_text() for p in pdf.pages]
+    lines, page_texts = _extraer(plumber, fixture_pdf, "resumen_generico.pdf")
+    assert page_texts == esperado
+    assert "02/01/24 TRANSF RECIB 30712345678 1.500,00 2.500,00" in lines
+
+
+@pytest.mark.parametrize("name", [
+    "resumen_generico.pdf",
+    "fuentes_mezcladas.pdf",  # importes en otro tamaño de letra, misma línea base
+    "hueco_angosto.pdf",      # pdfplumber junta "02/01/24TRANSF"
+    "movimiento_solapado.pdf",
+])
+def test_pymupdf_y_pdfplumber_leen_lo_mismo(plumber, fixture_pdf, monkeypatch, name):
+    pytest.importorskip("pymupdf")
+    esperado = _extraer(plumber, fixture_pdf, name)
+    monkeypatch.setattr(plumber, "PYMUPDF_OK", True)
+    assert _extraer(plumber, fixture_pdf, name) == esperado
+
+
+def test_pymupdf_renglon_con_fuentes_mezcladas(plumber, fixture_pdf, monkeypatch):
+    pytest.importorskip("pymupdf")
+    monkeypatch.setattr(plumber, "PYMUPDF_OK", True)
+    lines, _ = _extraer(plumber, fixture_pdf, "fuentes_mezcladas.pdf")
+    assert "02/01/24 TRANSF RECIB 1.500,00 2.500,00" in lines
+    assert len(plumber.parse_lines(lines)) == 2
+
+
+def test_si_pymupdf_falla_se_usa_pdfplumber(plumber, fixture_pdf, monkeypatch):
+    esperado = _extraer(plumber, fixture_pdf, "movimiento_solapado.pdf")
+
+    def _roto(data):
+        raise RuntimeError("PDF que PyMuPDF no abre")
+
+    monkeypatch.setattr(plumber, "PYMUPDF_OK", True)
+    monkeypatch.setattr(plumber, "_pymupdf_pages", _roto)
+    assert _extraer(plumber, fixture_pdf, "movimiento_solapado.pdf") == esperado
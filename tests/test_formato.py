@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+MONEY = ["debito", "credito", "importe", "saldo"]
+
+
+def _df():
+    return pd.DataFrame({
+        "fecha": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]),
+        "descripcion": ["IMPTRANS", "TRANSF RECIB", "IVA GRAL"],
+        "debito": [9.0, 0.0, 1234567.891],
+        "credito": [0.0, 1500.5, 0.0],
+        "importe": [9.0, -1500.5, np.nan],
+        "saldo": [-2380.0, 0.004, 1e12],
+    })
+
+
+def test_importes_con_formato_argentino(app):
+    view = app.money_view(_df())
+    assert view["debito"].tolist() == ["9,00", "0,00", "1.234.567,89"]
+    assert view["credito"].tolist() == ["0,00", "1.500,50", "0,00"]
+    assert view["importe"].tolist() == ["9,00", "-1.500,50", "—"]
+    assert view["saldo"].tolist() == ["-2.380,00", "0,00", "1.000.000.000.000,00"]
+
+
+def test_igual_que_fmt_ar_por_celda(app):
+    df = _df()
+    view = app.money_view(df)
+    for c in MONEY:
+        assert view[c].tolist() == [app.fmt_ar(v) for v in df[c]]
+
+
+def test_no_toca_el_original_ni_las_otras_columnas(app):
+    df = _df()
+    antes = df.copy()
+    view = app.money_view(df)
+    pd.testing.assert_frame_equal(df, antes)
+    pd.testing.assert_series_equal(view["fecha"], df["fecha"])
+    assert view["descripcion"].tolist() == df["descripcion"].tolist()
+    assert list(view.columns) == list(df.columns)
+
+
+def test_sin_filas_o_sin_columnas_de_importes(app):
+    vacio = app.money_view(_df().iloc[0:0])
+    assert vacio.empty and list(vacio.columns) == list(_df().columns)
+    solo_texto = pd.DataFrame({"descripcion": ["A"]})
+    pd.testing.assert_frame_equal(app.money_view(solo_texto), solo_texto)
+
+
+def test_fmt_ar(app):
+    assert app.fmt_ar(None) == "—"
+    assert app.fmt_ar(float("nan")) == "—"
+    assert app.fmt_ar(-0.5) == "-0,50"
+    assert app.fmt_ar(1234) == "1.234,00"
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+
+def test_lineas_de_titulo_encabezado_y_resumen_se_saltean(app):
+    lines = [
+        "CUENTA CORRIENTE BANCARIA NRO.: 3-123-0000000001-2 1.000,00 2.000,00",
+        "FECHA DESCRIPCION DEBITO CREDITO SALDO 1,00 2,00",
+        "TOTAL RESUMEN OPERATIVO 02/01/24 1.000,00 2.000,00",
+        "INFORMACIÓN DE SU/S CUENTA/S 02/01/24 1,00 2,00",
+        "02/01/24 TRANSF RECIB 30712345678 1.500,00 2.500,00",
+    ]
+    df = app.parse_lines(lines)
+    assert df["descripcion"].tolist() == ["TRANSF RECIB 30712345678"]
+
+
+def test_columnas_de_un_movimiento(app):
+    df = app.parse_lines(["SAN JUS 02/01/24 COMIS.TRANSF 123456789 120,00 2.380,00-"])
+    row = df.iloc[0]
+    assert row["fecha"] == pd.Timestamp(2024, 1, 2)
+    assert row["descripcion"] == "COMIS.TRANSF 123456789"
+    assert row["desc_norm"] == "COMIS.TRANSF"
+    assert row["importe"] == 120.0
+    assert row["saldo"] == -2380.0
+    assert row["orden"] == 1
+
+
+def test_lineas_que_no_son_movimientos(app):
+    lines = [
+        "",
+        "02/01/24 UN SOLO IMPORTE 1.500,00",
+        "1.500,00 2.500,00 02/01/24 FECHA DESPUES DEL IMPORTE",
+        "SIN FECHA 1.500,00 2.500,00",
+        "02/01/24 SIN COMA 1500 2500",
+    ]
+    assert app.parse_lines(lines).empty
+
+
+def test_fechas_con_anio_de_dos_y_cuatro_cifras(app):
+    df = app.parse_lines([
+        "02/01/24 IMPTRANS 9,00 2.491,00",
+        "3/01/2024 IVA GRAL 25,20 2.465,80",
+    ])
+    assert df["fecha"].tolist() == [pd.Timestamp(2024, 1, 2), pd.Timestamp(2024, 1, 3)]
+
+
+def test_upper_que_cambia_la_longitud(app):
+    # "ß".upper() == "SS": los spans se toman sobre la línea original
+    df = app.parse_lines(["02/01/24 Straße 5 1,00 2,00"])
+    assert df["descripcion"].tolist() == ["Straße 5"]
+    assert df["saldo"].tolist() == [2.0]
+
+
+def test_saldo_anterior_va_primero(app):
+    df = app.parse_lines(["05/01/24 IMPTRANS 9,00 991,00"], saldo_anterior=1000.0)
+    assert df["descripcion"].tolist() == ["SALDO ANTERIOR", "IMPTRANS"]
+    assert df["fecha"].iloc[0] == pd.Timestamp(2024, 1, 4, 23, 59, 59)
+    assert df["saldo"].tolist() == [1000.0, 991.0]
+    assert df["importe"].tolist() == [0.0, 9.0]
+    assert df["orden"].tolist() == [0, 1]
+
+
+def test_fechas_desordenadas_se_ordenan_por_fecha_y_aparicion(app):
+    lines = [
+        "SALDO ANTERIOR 1.000,00",
+        "03/01/24 TRANSF RECIB 500,00 1.400,00",
+        "02/01/24 IMPTRANS 100,00 900,00",
+        "03/01/24 IVA GRAL 50,00 1.350,00",
+    ]
+    r = app._compute_account_report("generico", lines)
+    df = r["df_sorted"]
+    assert df["descripcion"].tolist() == ["SALDO ANTERIOR", "IMPTRANS", "TRANSF RECIB", "IVA GRAL"]
+    assert df["debito"].tolist() == [0.0, 100.0, 0.0, 50.0]
+    assert df["credito"].tolist() == [0.0, 0.0, 500.0, 0.0]
+    assert np.isnan(df["delta_saldo"].iloc[0])
+    assert r["total_debitos"] == 150.0 and r["total_creditos"] == 500.0
+    assert r["cuadra"]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+def _anterior(app, lines):
+    return app.find_saldo_anterior_from_lines(lines)
+
+
+def test_saldo_anterior_macro_con_fecha_manda(app):
+    lines = [
+        "SALDO ANTERIOR 5,00",
+        "SALDO ULTIMO EXTRACTO AL 31/12/2023 1.000,00",
+    ]
+    assert _anterior(app, lines) == 1000.0
+
+
+def test_saldo_anterior_generico_gana_a_variantes(app):
+    lines = [
+        "SALDO ULTIMO RESUMEN 3,00",
+        "SALDO ÚLTIMO EXTRACTO 31/12/2023 7,00",
+        "SALDO ANTERIOR 5,00",
+    ]
+    assert _anterior(app, lines) == 5.0
+
+
+def test_saldo_anterior_variante_macro_gana_a_santa_fe(app):
+    lines = [
+        "SALDO ULTIMO RESUMEN 3,00",
+        "SALDO ÚLTIMO EXTRACTO 31/12/2023 7,00",
+    ]
+    assert _anterior(app, lines) == 7.0
+
+
+def test_saldo_anterior_sin_importe_unico_pasa_al_siguiente_nivel(app):
+    lines = [
+        "SALDO ANTERIOR 5,00 6,00",  # dos importes: no cuenta
+        "SALDO ULTIMO RESUMEN",
+        "2.000,00",
+    ]
+    assert _anterior(app, lines) == 2000.0
+
+
+def test_saldo_anterior_santa_fe_solo_primera_aparicion(app):
+    lines = [
+        "SALDO ULTIMO RESUMEN",
+        "SIN IMPORTE",
+        "OTRA LINEA",
+        "9,00",
+        "SALDO ULTIMO RESUMEN 4,00",
+    ]
+    assert np.isnan(_anterior(app, lines))
+
+
+def test_saldo_final_macro_con_fecha(app):
+    lines = [
+        "SALDO FINAL 1,00",
+        "SALDO FINAL AL DIA 31/01/2024 2.500,00",
+        "SALDO FINAL AL DIA 31/01/2024 2.600,00",
+    ]
+    fecha, saldo = app.find_saldo_final_from_lines(lines)
+    assert fecha == pd.Timestamp(2024, 1, 31)
+    assert saldo == 2600.0  # el último
+
+
+def test_saldo_final_bna_sin_fecha(app):
+    lines = ["SALDO FINAL 1.234,56", "SALDO FINAL 1.300,00", "- INTERESES $ 10,00"]
+    fecha, saldo = app.find_saldo_final_from_lines(lines)
+    assert pd.isna(fecha)
+    assert saldo == 1300.0
+
+
+def test_sin_saldos(app):
+    lines = ["02/01/24 IMPTRANS 9,00 2.491,00"]
+    fecha, saldo = app.find_saldo_final_from_lines(lines)
+    assert pd.isna(fecha) and np.isnan(saldo)
+    assert np.isnan(_anterior(app, lines))